@@ -6,10 +6,12 @@ Free for every student — from Los Angeles to Lima to Windhoek.
 """
 
 import streamlit as st
-import plotly.graph_objects as go
+import streamlit.components.v1 as components
 import numpy as np
 import math
+from bisect import bisect_left, bisect_right
 from datetime import datetime
+from types import SimpleNamespace
 import time
 
 # ─────────────────────────────────────────────
@@ -18,6 +20,7 @@ import time
 PREVIZ_VERSION = "4.3"
 STAGE_W = 30
 STAGE_H = 20
+TALENT_NAME_MAX = 40
 
 LENS_OPTIONS = ["12mm", "16mm", "24mm", "35mm", "50mm", "85mm", "100mm", "135mm"]
 LENS_FOV = {"12mm":90,"16mm":83,"24mm":73,"35mm":54,"50mm":39,"85mm":24,"100mm":20,"135mm":15}
@@ -25,6 +28,8 @@ LENS_FOV = {"12mm":90,"16mm":83,"24mm":73,"35mm":54,"50mm":39,"85mm":24,"100mm":
 ISO_OPTIONS       = [100, 200, 400, 800, 1600, 3200, 6400]
 RESOLUTION_OPTIONS= ["720p","1080p","4K UHD","4K DCI"]
 FPS_OPTIONS       = [24, 25, 30, 60]
+MODE_OPTIONS      = ["Video/Cinema","Photography"]
+PATH_OPTIONS      = ["Line","Soft Curve"]
 SHUTTER_BY_FPS    = {24:"1/48", 25:"1/50", 30:"1/60", 60:"1/120"}
 SHUTTER_DENOM     = {"1/48":48,"1/50":50,"1/60":60,"1/120":120}
 
@@ -33,6 +38,7 @@ ND_OPTIONS = {
     "ND 0.9 — 3 stops":3,"ND 1.2 — 4 stops":4,"ND 1.8 — 6 stops":6,
     "ND 2.4 — 8 stops":8,"ND 3.0 — 10 stops":10,
 }
+ND_LABELS  = list(ND_OPTIONS)
 FSTOPS = [1.0, 1.4, 2.0, 2.8, 4.0, 5.6, 8.0, 11, 16, 22]
 
 KELVIN_SCALE = [
@@ -51,6 +57,25 @@ RATIO_TABLE = [
     (10.0,"8:1","#FF6B00","Near noir"),
     (999,"16:1","#FF1744","High contrast noir"),
 ]
+# Lookup tables derived from the option lists and scales above. Like every
+# top-level name they are rebuilt on each rerun, so they save no work per
+# run; they only turn the lookups into bisects and dict gets.
+KELVIN_BOUNDS = tuple(mx for mx,_,_ in KELVIN_SCALE)
+RATIO_BOUNDS  = tuple(up for up,_,_,_ in RATIO_TABLE)
+ND_SHORT      = {k: k.split("—")[0].strip() for k in ND_OPTIONS}   # "ND 0.6 — 2 stops" → "ND 0.6"
+LENS_INDEX    = {v:i for i,v in enumerate(LENS_OPTIONS)}
+FPS_INDEX     = {v:i for i,v in enumerate(FPS_OPTIONS)}
+RES_INDEX     = {v:i for i,v in enumerate(RESOLUTION_OPTIONS)}
+ISO_INDEX     = {v:i for i,v in enumerate(ISO_OPTIONS)}
+MODE_INDEX    = {v:i for i,v in enumerate(MODE_OPTIONS)}
+PATH_INDEX    = {v:i for i,v in enumerate(PATH_OPTIONS)}
+ND_INDEX      = {v:i for i,v in enumerate(ND_LABELS)}
+CHIARO_BY_RATIO = {
+    "1:1":("Low Contrast","#4A90D9"),"2:1":("Low Contrast","#4A90D9"),"3:1":("Low Contrast","#4A90D9"),
+    "4:1":("Medium Contrast","#FF6B00"),"6:1":("Medium Contrast","#FF6B00"),
+}
+CHIARO_HIGH = ("High Contrast","#FF1744")
+
 TIPS = {
     "Key Light":    "The main light source. Establishes exposure and direction of primary shadows. Everything else is relative to it.",
     "Fill Light":   "Fills in the shadows from the Key. Always softer and dimmer. Controls how deep the shadows are.",
@@ -398,14 +423,29 @@ html, body, [data-testid="stApp"] {
 </style>
 """
 
+# Print is a browser-only action — a component button calls print() on the
+# app window directly, so clicking it doesn't cost a Streamlit rerun.
+PRINT_BUTTON = """
+<button onclick="window.parent.print()" style="width:100%;padding:6px 0;cursor:pointer;
+  background:#003A10;border:1px solid #00FF88;border-radius:4px;color:#00FF88;
+  font:700 14px 'Barlow Condensed',sans-serif;letter-spacing:0.14em">PRINT FLOOR PLAN</button>
+"""
+
+FOOTER_HTML = (
+    "<div class='previz-footer'>"
+    "Developed by Eduardo Carmona, MFA — CSUDH · LMU  ·  "
+    "GNU GPL v3.0  ·  "
+    "Free for every student — from Los Angeles to Lima to Windhoek."
+    "</div>")
+
 # ─────────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────────
 
 def kelvin_to_display(k):
-    for mx, color, name in KELVIN_SCALE:
-        if k <= mx: return color, name
-    return KELVIN_SCALE[-1][1], KELVIN_SCALE[-1][2]
+    # First band whose upper bound is >= k; clamp to the last band
+    _, color, name = KELVIN_SCALE[min(bisect_left(KELVIN_BOUNDS, k), len(KELVIN_SCALE)-1)]
+    return color, name
 
 def calculate_fstop(key_intensity, iso, shutter_str, nd_stops, mode):
     if key_intensity <= 0: return "---"
@@ -420,15 +460,13 @@ def calculate_fstop(key_intensity, iso, shutter_str, nd_stops, mode):
 
 def calculate_ratio(key_int, fill_int):
     if fill_int <= 0: return "INF:1","#FF1744","No fill — maximum contrast"
-    ratio = key_int / max(fill_int, 0.1)
-    for upper, label, color, mood in RATIO_TABLE:
-        if ratio < upper: return label, color, mood
+    # First band whose upper bound is strictly above the ratio
+    i = bisect_right(RATIO_BOUNDS, key_int / max(fill_int, 0.1))
+    if i < len(RATIO_TABLE): return RATIO_TABLE[i][1:]
     return "16:1","#FF1744","High contrast noir"
 
 def chiaroscuro_index(ratio_label):
-    if ratio_label in ["1:1","2:1","3:1"]: return "Low Contrast","#4A90D9"
-    elif ratio_label in ["4:1","6:1"]:    return "Medium Contrast","#FF6B00"
-    else:                                  return "High Contrast","#FF1744"
+    return CHIARO_BY_RATIO.get(ratio_label, CHIARO_HIGH)
 
 def get_suggestion(ratio_label, progress):
     if progress > 0.5 and "High" in chiaroscuro_index(ratio_label)[0]:
@@ -439,9 +477,10 @@ def get_suggestion(ratio_label, progress):
 
 def dist(x1,y1,x2,y2): return math.sqrt((x2-x1)**2+(y2-y1)**2)
 def ft_m(ft):           return round(ft*0.3048,1)
-def rot2d(vx,vy,theta): return (vx*math.cos(theta)-vy*math.sin(theta), vx*math.sin(theta)+vy*math.cos(theta))
+def rot2d(vx,vy,c,s):    return (vx*c-vy*s, vx*s+vy*c)   # c, s = cos/sin of the angle
 def hex_rgb(h):         return int(h[1:3],16), int(h[3:5],16), int(h[5:7],16)
 
+# Works on a scalar progress or elementwise on a NumPy array of them
 def interpolate_path(sd,ed,sp,ep,pt,prog):
     if pt=="Line":
         return sd+prog*(ed-sd), sp+prog*(ep-sp)
@@ -452,30 +491,186 @@ def interpolate_path(sd,ed,sp,ep,pt,prog):
 # SESSION STATE
 # ─────────────────────────────────────────────
 
+# Defaults for every session key, shared by init_state() on full and
+# fragment reruns. Every value is an immutable scalar/str/None, so session
+# state can be seeded straight from this dict without copying.
+STATE_DEFAULTS = {
+    "lens":"24mm","cam_pan":0,"cam_dolly":3.0,"fps":24,
+    "resolution":"1080p","iso":800,"nd_label":"None (0 stops)","mode":"Video/Cinema",
+    "key_intensity":80,"key_kelvin":5600,"key_x":22.0,
+    "fill1_on":True,"fill1_intensity":40,"fill1_kelvin":5600,
+    "back_on":True,"back_intensity":60,"back_kelvin":5600,
+    "fill2_on":False,"fill2_intensity":40,"fill2_kelvin":5600,"fill2_x":26.0,"fill2_y":16.0,
+    "talent_name":"Actor","talent_x":15.0,"talent_y":10.0,
+    "approved_dp":False,"approved_gaffer":False,"approved_director":False,"approved_at":None,
+    "moving_shot_on":False,"start_dolly":3.0,"end_dolly":7.0,
+    "start_pan":-15,"end_pan":15,"path_type":"Line",
+    "progress":0.0,"auto_play":False,
+}
+
 def init_state():
-    defaults = {
-        "lens":"24mm","cam_pan":0,"cam_dolly":3.0,"fps":24,
-        "resolution":"1080p","iso":800,"nd_label":"None (0 stops)","mode":"Video/Cinema",
-        "key_intensity":80,"key_kelvin":5600,"key_x":22.0,
-        "fill1_on":True,"fill1_intensity":40,"fill1_kelvin":5600,
-        "back_on":True,"back_intensity":60,"back_kelvin":5600,
-        "fill2_on":False,"fill2_intensity":40,"fill2_kelvin":5600,"fill2_x":26.0,"fill2_y":16.0,
-        "talent_name":"Actor","talent_x":15.0,"talent_y":10.0,
-        "approved_dp":False,"approved_gaffer":False,"approved_director":False,"approved_at":None,
-        "moving_shot_on":False,"start_dolly":3.0,"end_dolly":7.0,
-        "start_pan":-15,"end_pan":15,"path_type":"Line",
-        "progress":0.0,"auto_play":False,
-    }
-    for k,v in defaults.items():
-        if k not in st.session_state:
-            st.session_state[k] = v
+    s = st.session_state
+    for k,v in STATE_DEFAULTS.items():
+        s.setdefault(k, v)
 
 # ─────────────────────────────────────────────
 # FLOOR PLAN  — kinetic broadcast look
 # ─────────────────────────────────────────────
 
+# ── STATIC STAGE  — nothing here depends on state ──────────────────────
+# Streamlit re-executes this script top to bottom on every rerun, so the
+# heavier pieces are built behind st.cache_resource: once per server
+# process, shared read-only by every session.
+FLOOR  = "#050912"
+WALL   = "#0E1830"
+GRID_M = "#090E1A"   # minor grid
+GRID_5 = "#0C1224"   # 5-ft grid
+DIM    = "#1E2A44"   # dimmed labels
+LBL    = "#2A3A5A"   # wall labels
+
+@st.cache_resource(show_spinner=False)
+def _build_stage_shapes(W, H):
+    shapes = [dict(type="rect",x0=0,y0=0,x1=W,y1=H,
+                   fillcolor=FLOOR, line=dict(color=WALL,width=3))]
+    # Minor grid every 1 ft (very faint)
+    for x in range(1,W):
+        c = GRID_5 if x%5==0 else GRID_M
+        w = 1.2 if x%5==0 else 0.5
+        shapes.append(dict(type="line",x0=x,y0=0,x1=x,y1=H,line=dict(color=c,width=w)))
+    for y in range(1,H):
+        c = GRID_5 if y%5==0 else GRID_M
+        w = 1.2 if y%5==0 else 0.5
+        shapes.append(dict(type="line",x0=0,y0=y,x1=W,y1=y,line=dict(color=c,width=w)))
+    # 4th wall — open (glowing blue)
+    shapes.append(dict(type="line",x0=0,y0=0,x1=W,y1=0,
+                       line=dict(color="#0040A0",width=2.5,dash="dot")))
+    return shapes
+
+@st.cache_resource(show_spinner=False)
+def _build_stage_annots(W, H):
+    mono = "JetBrains Mono"
+    return [
+        # Wall labels
+        dict(x=-2,y=H/2,text="WALL 1",textangle=-90,showarrow=False,
+             font=dict(size=9,color=LBL,family=mono)),
+        dict(x=W/2,y=H+1.6,text="WALL 2 — BACK",showarrow=False,
+             font=dict(size=9,color=LBL,family=mono)),
+        dict(x=W+2,y=H/2,text="WALL 3",textangle=90,showarrow=False,
+             font=dict(size=9,color=LBL,family=mono)),
+        dict(x=W/2,y=-0.7,text="4TH WALL — OPEN  ·  CLICK STAGE TO MOVE TALENT",
+             showarrow=False,font=dict(size=9,color="#0050C0",family=mono)),
+        # Dimensions
+        dict(x=W/2,y=H+0.8,text="30 ft  ·  9.1 m",
+             showarrow=False,font=dict(size=8,color=DIM,family=mono)),
+        dict(x=-0.7,y=H/2,text="20 ft · 6.1 m",textangle=-90,
+             showarrow=False,font=dict(size=8,color=DIM,family=mono)),
+    ]
+
+@st.cache_resource(show_spinner=False)
+def _build_click_grid(W, H):
+    # 1-ft lattice, x-major, as float32 so Plotly can ship it as a typed array
+    gx, gy = np.meshgrid(np.arange(W+1, dtype=np.float32),
+                         np.arange(H+1, dtype=np.float32), indexing="ij")
+    gx, gy = gx.ravel(), gy.ravel()
+    gx.flags.writeable = gy.flags.writeable = False   # shared across sessions
+    return gx, gy
+
+@st.cache_resource(show_spinner=False)
+def _build_click_trace(W, H):
+    # ── INVISIBLE CLICK-CAPTURE GRID (1-ft resolution) ──────────────
+    # Students click here to move talent — the magic interaction.
+    # 651 invisible points: WebGL (scattergl) hit-tests them far faster than
+    # SVG. The small styled traces stay SVG to keep their layering.
+    gx, gy = _build_click_grid(W, H)
+    return dict(type="scattergl",
+        x=gx, y=gy, mode="markers",
+        marker=dict(size=10, color="rgba(0,0,0,0)", opacity=0),
+        showlegend=False,
+        hovertemplate="Click to place talent here<br>X: %{x:.0f} ft  ·  Y: %{y:.0f} ft<extra></extra>",
+        name="__stage_click__")
+
+@st.cache_resource(show_spinner=False)
+def _build_plan_layout(W, H):
+    # Layout fields that never change; the builder adds shapes and annotations
+    return dict(
+        margin=dict(l=55,r=175,t=16,b=16),
+        paper_bgcolor="#02040A",
+        plot_bgcolor="#02040A",
+        xaxis=dict(range=[-3,W+11],showgrid=False,zeroline=False,
+                   showticklabels=False,scaleanchor="y",scaleratio=1,fixedrange=True),
+        yaxis=dict(range=[-12.5,H+4.5],showgrid=False,zeroline=False,
+                   showticklabels=False,fixedrange=True),
+        height=780, dragmode=False, showlegend=False,
+        # Constant uirevision keeps hover/selection UI state across reruns
+        # instead of resetting it with every new figure.
+        hovermode="closest", uirevision="stage",
+    )
+
+# Tiny samples — cheaper to rebuild each run than to look up in a cache
+PATH_T           = np.linspace(0, 1, 30, dtype=np.float32)   # moving-shot trail samples
+DOME_ARC         = np.linspace(-math.pi/2, math.pi/2, 48)     # key fresnel half-circle
+
+# Axes are fixed and dragmode is off, so the zoom/pan/select buttons do
+# nothing — keep only the PNG export
+PLAN_CONFIG = dict(displaylogo=False, modeBarButtonsToRemove=[
+    "zoom2d","pan2d","select2d","lasso2d","zoomIn2d","zoomOut2d",
+    "autoScale2d","resetScale2d"])
+
+# Shared hover templates — per-point values travel in customdata
+LIGHT_HOVER = ("<b>%{customdata[0]}</b><br>%{customdata[1]}<br>"
+               "%{customdata[2]}K — %{customdata[3]}<br>Intensity: %{customdata[4]}%<extra></extra>")
+CAM_HOVER   = ("<b>%{customdata[0]}</b><br>%{customdata[1]} | FOV:%{customdata[2]}deg<br>"
+               "Pan:%{customdata[3]}deg<br>Dolly:%{y:.1f}ft<extra></extra>")
+
+# Every fixture except the key: label, hover name, on/intensity/kelvin keys,
+# fixed (x,y) — or the x/y keys of a mobile light — and halo (radius, alpha)
+# rings. Mobile fixtures are left off the plan entirely when switched off.
+HALO_OVERHEAD = ((4.5,0.4),(2.8,0.7),(1.5,1.0))
+HALO_MOBILE   = ((4.0,0.35),(2.5,0.65),(1.3,1.0))
+FIXTURES = (
+    ("FILL 1","FILL 1",       "fill1_on","fill1_intensity","fill1_kelvin",(4,16),         None,               HALO_OVERHEAD),
+    ("BACK",  "BACK",         "back_on", "back_intensity", "back_kelvin", (STAGE_W/2,18), None,               HALO_OVERHEAD),
+    ("FILL 2","FILL 2 Mobile","fill2_on","fill2_intensity","fill2_kelvin",None,           ("fill2_x","fill2_y"),HALO_MOBILE),
+)
+
+# Every state key the floor plan reads. The figure is a pure function of
+# these, so they double as its cache key.
+PLAN_KEYS = (
+    "lens","cam_pan","cam_dolly","fps","resolution","iso","nd_label","mode",
+    "key_intensity","key_kelvin","key_x",
+    "fill1_on","fill1_intensity","fill1_kelvin",
+    "back_on","back_intensity","back_kelvin",
+    "fill2_on","fill2_intensity","fill2_kelvin","fill2_x","fill2_y",
+    "talent_name","talent_x","talent_y",
+    "moving_shot_on","start_dolly","end_dolly","start_pan","end_pan","path_type",
+    "progress",
+)
+
+# Keys that are only drawn in one mode. Leaving the idle set out of the key
+# means e.g. scrubbing Progress with the moving shot off doesn't rebuild.
+MOVING_ONLY_KEYS = frozenset(("start_dolly","end_dolly","start_pan","end_pan","path_type","progress"))
+STATIC_ONLY_KEYS = frozenset(("cam_pan","cam_dolly"))
+FILL2_KEYS       = frozenset(("fill2_intensity","fill2_kelvin","fill2_x","fill2_y"))
+
+def _freeze(s):
+    idle = STATIC_ONLY_KEYS if s["moving_shot_on"] else MOVING_ONLY_KEYS
+    if not s["fill2_on"]: idle = idle | FILL2_KEYS
+    return tuple((k, s[k]) for k in PLAN_KEYS if k not in idle)
+
 def draw_floor_plan():
-    s    = st.session_state
+    # Reruns that leave the plan's inputs untouched (approval checkboxes,
+    # expanders, chart clicks) reuse the last figure this session drew as-is,
+    # skipping even the copy st.cache_data hands back on a hit.
+    s   = st.session_state
+    key = _freeze(s)
+    if s.get("_plan_key") != key:
+        s["_plan_fig"] = _build_floor_plan(key)
+        s["_plan_key"] = key
+    return s["_plan_fig"]
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_floor_plan(frozen):
+    s    = SimpleNamespace(**dict(frozen))
     W, H = STAGE_W, STAGE_H
 
     fov         = LENS_FOV[s.lens]
@@ -483,9 +678,10 @@ def draw_floor_plan():
     nd_stops    = ND_OPTIONS[s.nd_label]
     fstop       = calculate_fstop(s.key_intensity, s.iso, shutter_str, nd_stops, s.mode)
     cam_x       = W / 2
-    progress    = s.progress
 
+    # Mode-specific keys are absent from s when idle — see _freeze()
     if s.moving_shot_on:
+        progress       = s.progress
         cam_y, cam_pan = interpolate_path(s.start_dolly,s.end_dolly,s.start_pan,s.end_pan,s.path_type,progress)
     else:
         cam_y, cam_pan = s.cam_dolly, s.cam_pan
@@ -498,74 +694,28 @@ def draw_floor_plan():
     rl, rc, rm           = calculate_ratio(s.key_intensity, fill_int)
     cam_to_t             = dist(cam_x,cam_y,tx,ty)
     key_to_t             = dist(key_x,key_y,tx,ty)
-    chiaro_idx, chiaro_c = chiaroscuro_index(rl)
-    suggestion           = get_suggestion(rl, progress)
     kr, kg, kb           = hex_rgb(key_color)
 
-    fig = go.Figure()
-
     # ── STAGE FLOOR  deep-toned with scanlines ──────────────────────
-    FLOOR  = "#050912"
-    WALL   = "#0E1830"
-    GRID_M = "#090E1A"   # minor grid
-    GRID_5 = "#0C1224"   # 5-ft grid
-    DIM    = "#1E2A44"
-    LBL    = "#2A3A5A"
-
-    fig.add_shape(type="rect",x0=0,y0=0,x1=W,y1=H,
-                  fillcolor=FLOOR, line=dict(color=WALL,width=3))
-
-    # Minor grid every 1 ft (very faint)
-    for x in range(1,W):
-        c = GRID_5 if x%5==0 else GRID_M
-        w = 1.2 if x%5==0 else 0.5
-        fig.add_shape(type="line",x0=x,y0=0,x1=x,y1=H,line=dict(color=c,width=w))
-    for y in range(1,H):
-        c = GRID_5 if y%5==0 else GRID_M
-        w = 1.2 if y%5==0 else 0.5
-        fig.add_shape(type="line",x0=0,y0=y,x1=W,y1=y,line=dict(color=c,width=w))
-
-    # 4th wall — open (glowing blue)
-    fig.add_shape(type="line",x0=0,y0=0,x1=W,y1=0,
-                  line=dict(color="#0040A0",width=2.5,dash="dot"))
-
-    # Wall labels
-    for ann in [
-        dict(x=-2,y=H/2,text="WALL 1",textangle=-90,showarrow=False,
-             font=dict(size=9,color=LBL,family="JetBrains Mono")),
-        dict(x=W/2,y=H+1.6,text="WALL 2 — BACK",showarrow=False,
-             font=dict(size=9,color=LBL,family="JetBrains Mono")),
-        dict(x=W+2,y=H/2,text="WALL 3",textangle=90,showarrow=False,
-             font=dict(size=9,color=LBL,family="JetBrains Mono")),
-        dict(x=W/2,y=-0.7,text="4TH WALL — OPEN  ·  CLICK STAGE TO MOVE TALENT",
-             showarrow=False,font=dict(size=9,color="#0050C0",family="JetBrains Mono")),
-    ]:
-        fig.add_annotation(**ann)
-
-    fig.add_annotation(x=W/2,y=H+0.8,text="30 ft  ·  9.1 m",
-                       showarrow=False,font=dict(size=8,color=DIM,family="JetBrains Mono"))
-    fig.add_annotation(x=-0.7,y=H/2,text="20 ft · 6.1 m",textangle=-90,
-                       showarrow=False,font=dict(size=8,color=DIM,family="JetBrains Mono"))
-
-    # ── INVISIBLE CLICK-CAPTURE GRID (1-ft resolution) ──────────────
-    # Students click here to move talent — the magic interaction
-    cx_g = [float(x) for x in range(0,W+1) for _ in range(0,H+1)]
-    cy_g = [float(y) for _ in range(0,W+1) for y in range(0,H+1)]
-    fig.add_trace(go.Scatter(
-        x=cx_g, y=cy_g, mode="markers",
-        marker=dict(size=10, color="rgba(0,0,0,0)", opacity=0),
-        showlegend=False,
-        hovertemplate="Click to place talent here<br>X: %{x:.0f} ft  ·  Y: %{y:.0f} ft<extra></extra>",
-        name="__stage_click__"
-    ))
-
-    # ── OVERHEAD LIGHTS  — glowing halos ────────────────────────────
-    overhead = [
-        (4,   16, "fill1_on","fill1_intensity","fill1_kelvin","FILL 1"),
-        (W/2, 18, "back_on", "back_intensity", "back_kelvin", "BACK"),
-    ]
-    for lx,ly,k_on,k_int,k_k,label in overhead:
-        is_on   = getattr(s,k_on)
+    # Everything is collected as plain dicts and returned as a plain figure
+    # dict: st.plotly_chart validates it once, and cache hits unpickle dicts
+    # rather than re-validating a go.Figure. Plotly itself is only imported
+    # by Streamlit. Floor, grid, 4th wall, wall/dimension labels, the click
+    # lattice and the base layout are shared prebuilt pieces (cache_resource),
+    # fetched only here so a figure-cache hit never touches them.
+    traces = [_build_click_trace(W, H)]
+    shapes = list(_build_stage_shapes(W, H))
+    annots = list(_build_stage_annots(W, H))
+
+    # ── OVERHEAD + MOBILE LIGHTS  — glowing halos ───────────────────
+    # Fixture markers are collected here and drawn with the other markers
+    lm_x, lm_y, lm_c, lm_data = [], [], [], []
+    for label,name,k_on,k_int,k_k,pos,pos_keys,halos in FIXTURES:
+        is_on = getattr(s,k_on)
+        if pos is None:
+            if not is_on: continue
+            pos = getattr(s,pos_keys[0]), getattr(s,pos_keys[1])
+        lx,ly   = pos
         lkelvin = getattr(s,k_k)
         lintens = getattr(s,k_int)
         lc, ln  = kelvin_to_display(lkelvin)
@@ -574,58 +724,36 @@ def draw_floor_plan():
         if is_on:
             # Wide diffuse halo
             ga = max(0.03, lintens/100*0.22)
-            for radius, alpha_mult in [(4.5,0.4),(2.8,0.7),(1.5,1.0)]:
-                fig.add_shape(type="circle",x0=lx-radius,y0=ly-radius,x1=lx+radius,y1=ly+radius,
-                              fillcolor=f"rgba({r},{g},{b},{ga*alpha_mult:.3f})",
-                              line=dict(color="rgba(0,0,0,0)",width=0))
+            for radius, alpha_mult in halos:
+                shapes.append(dict(type="circle",x0=lx-radius,y0=ly-radius,x1=lx+radius,y1=ly+radius,
+                                   fillcolor=f"rgba({r},{g},{b},{ga*alpha_mult:.3f})",
+                                   line=dict(color="rgba(0,0,0,0)",width=0)))
             # Fixture body
-            fig.add_shape(type="circle",x0=lx-1.0,y0=ly-1.0,x1=lx+1.0,y1=ly+1.0,
-                          fillcolor=f"rgba({r},{g},{b},0.55)",line=dict(color=lc,width=2))
+            shapes.append(dict(type="circle",x0=lx-1.0,y0=ly-1.0,x1=lx+1.0,y1=ly+1.0,
+                               fillcolor=f"rgba({r},{g},{b},0.55)",line=dict(color=lc,width=2)))
             mc = lc
         else:
-            fig.add_shape(type="circle",x0=lx-1.0,y0=ly-1.0,x1=lx+1.0,y1=ly+1.0,
-                          fillcolor="#0A0E18",line=dict(color="#151E30",width=1.5))
+            shapes.append(dict(type="circle",x0=lx-1.0,y0=ly-1.0,x1=lx+1.0,y1=ly+1.0,
+                               fillcolor="#0A0E18",line=dict(color="#151E30",width=1.5)))
             mc = "#151E30"
 
-        fig.add_trace(go.Scatter(x=[lx],y=[ly],mode="markers",
-            marker=dict(size=14,color=mc,symbol="square",line=dict(color="#02050C",width=2)),
-            showlegend=False,
-            hovertemplate=f"<b>{label}</b><br>{'ON' if is_on else 'OFF'}<br>{lkelvin}K — {ln}<br>Intensity: {lintens}%<extra></extra>"))
-        fig.add_annotation(x=lx,y=ly+1.9,text=f"<b>{label}</b><br>{lkelvin}K",
-                           showarrow=False,font=dict(size=8,color=lc if is_on else DIM,family="JetBrains Mono"),align="center")
-
-    # Mobile Fill #2
-    if s.fill2_on:
-        lx,ly   = s.fill2_x, s.fill2_y
-        lkelvin = s.fill2_kelvin
-        lintens = s.fill2_intensity
-        lc,ln   = kelvin_to_display(lkelvin)
-        r,g,b   = hex_rgb(lc)
-        ga      = max(0.03, lintens/100*0.22)
-        for radius, am in [(4.0,0.35),(2.5,0.65),(1.3,1.0)]:
-            fig.add_shape(type="circle",x0=lx-radius,y0=ly-radius,x1=lx+radius,y1=ly+radius,
-                          fillcolor=f"rgba({r},{g},{b},{ga*am:.3f})",line=dict(color="rgba(0,0,0,0)",width=0))
-        fig.add_shape(type="circle",x0=lx-1.0,y0=ly-1.0,x1=lx+1.0,y1=ly+1.0,
-                      fillcolor=f"rgba({r},{g},{b},0.55)",line=dict(color=lc,width=2))
-        fig.add_trace(go.Scatter(x=[lx],y=[ly],mode="markers",
-            marker=dict(size=14,color=lc,symbol="square",line=dict(color="#02050C",width=2)),
-            showlegend=False,
-            hovertemplate=f"<b>FILL 2 Mobile</b><br>ON<br>{lkelvin}K — {ln}<br>Intensity: {lintens}%<extra></extra>"))
-        fig.add_annotation(x=lx,y=ly+1.9,text=f"<b>FILL 2</b><br>{lkelvin}K",
-                           showarrow=False,font=dict(size=8,color=lc,family="JetBrains Mono"),align="center")
+        lm_x.append(lx); lm_y.append(ly); lm_c.append(mc)
+        lm_data.append((name, "ON" if is_on else "OFF", lkelvin, ln, lintens))
+        annots.append(dict(x=lx,y=ly+1.9,text=f"<b>{label}</b><br>{lkelvin}K",
+                           showarrow=False,font=dict(size=8,color=lc if is_on else DIM,family="JetBrains Mono"),align="center"))
 
     # ── KEY LIGHT  — hot beam + fresnel ─────────────────────────────
     key_alpha = max(0.04, s.key_intensity/100*0.30)
 
     # Staged concentric glow — like a real fresnel spill
     for r_halo, a_mult in [(6.0,0.25),(4.0,0.5),(2.5,0.8)]:
-        fig.add_shape(type="circle",x0=key_x-r_halo,y0=key_y-r_halo,x1=key_x+r_halo,y1=key_y+r_halo,
-                      fillcolor=f"rgba({kr},{kg},{kb},{key_alpha*a_mult:.3f})",
-                      line=dict(color="rgba(0,0,0,0)",width=0))
+        shapes.append(dict(type="circle",x0=key_x-r_halo,y0=key_y-r_halo,x1=key_x+r_halo,y1=key_y+r_halo,
+                           fillcolor=f"rgba({kr},{kg},{kb},{key_alpha*a_mult:.3f})",
+                           line=dict(color="rgba(0,0,0,0)",width=0)))
 
     # Beam line (hot, thick)
     beam_w = max(1.5, s.key_intensity/100*4.0)
-    fig.add_trace(go.Scatter(
+    traces.append(dict(type="scatter",
         x=[key_x,tx],y=[key_y,ty],mode="lines",
         line=dict(color=f"rgba({kr},{kg},{kb},0.55)",width=beam_w),
         showlegend=False,hoverinfo="skip"))
@@ -633,41 +761,46 @@ def draw_floor_plan():
     # Fresnel dome arc
     ang_to_t = math.atan2(ty-key_y, tx-key_x)
     dome_r   = 1.8
-    arc_a    = np.linspace(ang_to_t-math.pi/2, ang_to_t+math.pi/2, 48)
-    fig.add_trace(go.Scatter(
-        x=[key_x+dome_r*math.cos(a) for a in arc_a],
-        y=[key_y+dome_r*math.sin(a) for a in arc_a],
+    arc_a    = ang_to_t + DOME_ARC
+    traces.append(dict(type="scatter",
+        x=(key_x+dome_r*np.cos(arc_a)).astype(np.float32),
+        y=(key_y+dome_r*np.sin(arc_a)).astype(np.float32),
         mode="lines",fill="toself",
         fillcolor=f"rgba({kr},{kg},{kb},0.92)",
         line=dict(color=key_color,width=2.5),
         showlegend=False,
         hovertemplate=f"<b>KEY LIGHT</b><br>{s.key_kelvin}K — {key_kname}<br>Intensity: {s.key_intensity}%<extra></extra>"))
-    fig.add_annotation(x=key_x,y=key_y+dome_r+1.5,
+    annots.append(dict(x=key_x,y=key_y+dome_r+1.5,
                        text=f"<b>KEY</b><br>{s.key_kelvin}K",
-                       showarrow=False,font=dict(size=9,color=key_color,family="JetBrains Mono"),align="center")
+                       showarrow=False,font=dict(size=9,color=key_color,family="JetBrains Mono"),align="center"))
 
     # ── CAMERA  — teal tactical ──────────────────────────────────────
     TEAL_CAM = "#00D4CC"
     rc_r,rc_g,rc_b = hex_rgb(TEAL_CAM)
 
+    # Camera bodies are collected here and drawn with the other markers
+    cb_x, cb_y, cb_size, cb_color, cb_line, cb_data = [], [], [], [], [], []
+    # FOV cones sharing a (scale, opacity) style go into one None-separated
+    # trace — "toself" still fills each triangle on its own
+    cones = {}
+
+    # Half-FOV rotation is the same for every camera position — trig once
+    fov_half_rad = math.radians(fov/2)
+    hc, hs       = math.cos(fov_half_rad), math.sin(fov_half_rad)
+
     def add_camera(cy_pos, pan_deg, label="", opacity=1.0, ghost=False):
         pan_rad      = math.radians(pan_deg)
-        fov_half_rad = math.radians(fov/2)
         fwd          = (math.sin(pan_rad), math.cos(pan_rad))
         cone_len     = min(14.0, H-cy_pos+0.5)
-        ld           = rot2d(fwd[0],fwd[1], fov_half_rad)
-        rd           = rot2d(fwd[0],fwd[1],-fov_half_rad)
+        ld           = rot2d(fwd[0],fwd[1],hc, hs)
+        rd           = rot2d(fwd[0],fwd[1],hc,-hs)
 
         # FOV cone with gradient-like layering
-        for scale, ao in [(1.0,0.08),(0.6,0.05)]:
+        for scale in (1.0, 0.6):
             lx2 = cam_x + ld[0]*cone_len*scale; ly2 = cy_pos + ld[1]*cone_len*scale
             rx2 = cam_x + rd[0]*cone_len*scale; ry2 = cy_pos + rd[1]*cone_len*scale
-            fig.add_trace(go.Scatter(
-                x=[cam_x,lx2,rx2,cam_x],y=[cy_pos,ly2,ry2,cy_pos],
-                fill="toself",
-                fillcolor=f"rgba({rc_r},{rc_g},{rc_b},{ao*opacity:.3f})",
-                line=dict(color=f"rgba({rc_r},{rc_g},{rc_b},{0.4*opacity:.3f})",width=1.5 if scale==1.0 else 0),
-                mode="lines",showlegend=False,hoverinfo="skip"))
+            xs, ys = cones.setdefault((scale, opacity), ([], []))
+            xs += [cam_x,lx2,rx2,cam_x,None]; ys += [cy_pos,ly2,ry2,cy_pos,None]
 
         # Camera body scale with dolly distance (closer = bigger)
         sf   = max(0.55, 3.0/max(cy_pos,0.5))
@@ -677,91 +810,106 @@ def draw_floor_plan():
         # Glow behind camera
         if not ghost:
             for gr,gao in [(3.5,0.06),(2.0,0.12)]:
-                fig.add_shape(type="circle",
-                              x0=cam_x-gr,y0=cy_pos-gr,x1=cam_x+gr,y1=cy_pos+gr,
-                              fillcolor=f"rgba({rc_r},{rc_g},{rc_b},{gao*opacity:.3f})",
-                              line=dict(color="rgba(0,0,0,0)",width=0))
+                shapes.append(dict(type="circle",
+                                   x0=cam_x-gr,y0=cy_pos-gr,x1=cam_x+gr,y1=cy_pos+gr,
+                                   fillcolor=f"rgba({rc_r},{rc_g},{rc_b},{gao*opacity:.3f})",
+                                   line=dict(color="rgba(0,0,0,0)",width=0)))
 
-        fig.add_trace(go.Scatter(x=[cam_x],y=[cy_pos],mode="markers",
-            marker=dict(size=28*sf,color=body,symbol="square",
-                        line=dict(color=f"rgba(0,240,230,{ga:.2f})",width=2.5)),
-            showlegend=False,
-            hovertemplate=f"<b>{label}</b><br>{s.lens} | FOV:{fov}deg<br>Pan:{pan_deg}deg<br>Dolly:{cy_pos:.1f}ft<extra></extra>"))
+        cb_x.append(cam_x); cb_y.append(cy_pos); cb_size.append(28*sf); cb_color.append(body)
+        cb_line.append(f"rgba(0,240,230,{ga:.2f})")
+        cb_data.append((label, s.lens, fov, pan_deg))
 
         if label and not ghost:
-            fig.add_annotation(x=cam_x+2.6,y=cy_pos+0.5,text=label,showarrow=False,
-                               font=dict(size=9,color=TEAL_CAM,family="JetBrains Mono"))
+            annots.append(dict(x=cam_x+2.6,y=cy_pos+0.5,text=label,showarrow=False,
+                               font=dict(size=9,color=TEAL_CAM,family="JetBrains Mono")))
 
     if not s.moving_shot_on:
         add_camera(cam_y,cam_pan,"MASTER SHOT")
     else:
         # Path trail
-        pts    = [interpolate_path(s.start_dolly,s.end_dolly,s.start_pan,s.end_pan,s.path_type,t)
-                  for t in np.linspace(0,1,30)]
-        py_s, _ = zip(*pts)
+        py_s, _ = interpolate_path(s.start_dolly,s.end_dolly,s.start_pan,s.end_pan,s.path_type,PATH_T)
+        py_s    = py_s.astype(np.float32, copy=False)
         dash    = "dash" if s.path_type=="Line" else "dot"
-        fig.add_trace(go.Scatter(
-            x=[cam_x]*len(py_s),y=list(py_s),mode="lines",
+        traces.append(dict(type="scatter",
+            x=np.full_like(py_s, cam_x),y=py_s,mode="lines",
             line=dict(color=f"rgba({rc_r},{rc_g},{rc_b},0.25)",width=2,dash=dash),
             showlegend=False,hovertemplate="Camera Path<extra></extra>"))
         add_camera(cam_y,        cam_pan,    f"PROGRESS {int(progress*100)}%")
         add_camera(s.start_dolly,s.start_pan,"POS A",opacity=0.4,ghost=True)
         add_camera(s.end_dolly,  s.end_pan,  "POS B",opacity=0.4,ghost=True)
 
-        fig.add_annotation(x=cam_x-3.0,y=cam_y-1.4,
+        chiaro_idx, chiaro_c = chiaroscuro_index(rl)
+        annots.append(dict(x=cam_x-3.0,y=cam_y-1.4,
                            text=f"<b>{chiaro_idx}</b><br>{rl}",
                            showarrow=False,bgcolor=chiaro_c,
                            bordercolor=chiaro_c,borderwidth=1,
-                           font=dict(size=8,color="white",family="JetBrains Mono"),align="center")
+                           font=dict(size=8,color="white",family="JetBrains Mono"),align="center"))
+        suggestion = get_suggestion(rl, progress)
         if suggestion:
-            fig.add_annotation(x=W/2,y=H+2.5,text=f"// {suggestion}",showarrow=False,
-                               font=dict(size=10,color="#FFE200",family="JetBrains Mono"),align="center")
+            annots.append(dict(x=W/2,y=H+2.5,text=f"// {suggestion}",showarrow=False,
+                               font=dict(size=10,color="#FFE200",family="JetBrains Mono"),align="center"))
+
+    for (scale, opacity), (xs, ys) in cones.items():
+        ao = 0.08 if scale==1.0 else 0.05
+        traces.append(dict(type="scatter",
+            x=xs,y=ys,fill="toself",
+            fillcolor=f"rgba({rc_r},{rc_g},{rc_b},{ao*opacity:.3f})",
+            line=dict(color=f"rgba({rc_r},{rc_g},{rc_b},{0.4*opacity:.3f})",width=1.5 if scale==1.0 else 0),
+            mode="lines",showlegend=False,hoverinfo="skip"))
 
     # ── TALENT  — hot red crosshair + light spill ────────────────────
     # Key light spill on subject
     spill = min(3.5, max(0.8, s.key_intensity/100*3.5))
-    fig.add_shape(type="circle",x0=tx-spill,y0=ty-spill,x1=tx+spill,y1=ty+spill,
-                  fillcolor=f"rgba({kr},{kg},{kb},{max(0.03,s.key_intensity/100*0.12):.3f})",
-                  line=dict(color="rgba(0,0,0,0)",width=0))
+    shapes.append(dict(type="circle",x0=tx-spill,y0=ty-spill,x1=tx+spill,y1=ty+spill,
+                       fillcolor=f"rgba({kr},{kg},{kb},{max(0.03,s.key_intensity/100*0.12):.3f})",
+                       line=dict(color="rgba(0,0,0,0)",width=0)))
 
     # Outer targeting ring
-    fig.add_shape(type="circle",x0=tx-2.2,y0=ty-2.2,x1=tx+2.2,y1=ty+2.2,
-                  fillcolor="rgba(0,0,0,0)",
-                  line=dict(color="rgba(255,23,68,0.30)",width=1,dash="dot"))
+    shapes.append(dict(type="circle",x0=tx-2.2,y0=ty-2.2,x1=tx+2.2,y1=ty+2.2,
+                       fillcolor="rgba(0,0,0,0)",
+                       line=dict(color="rgba(255,23,68,0.30)",width=1,dash="dot")))
 
     # Crosshair lines
-    fig.add_trace(go.Scatter(
+    traces.append(dict(type="scatter",
         x=[tx-2.0,tx+2.0,None,tx,tx],y=[ty,ty,None,ty-2.0,ty+2.0],
         mode="lines",line=dict(color="#FF1744",width=2.5),
         showlegend=False,hoverinfo="skip"))
 
-    # Center dot
-    fig.add_trace(go.Scatter(x=[tx],y=[ty],mode="markers",
-        marker=dict(size=30,color="rgba(255,23,68,0.08)",symbol="circle",
-                    line=dict(color="#FF1744",width=3.0)),
-        showlegend=False,
-        hovertemplate=(f"<b>{s.talent_name}</b><br>"
-                       f"X: {tx:.1f} ft ({ft_m(tx):.1f} m)<br>"
-                       f"Y: {ty:.1f} ft ({ft_m(ty):.1f} m)<br>"
-                       f"Cam→Talent: {cam_to_t:.1f} ft ({ft_m(cam_to_t):.1f} m)<br>"
-                       f"Key→Talent: {key_to_t:.1f} ft ({ft_m(key_to_t):.1f} m)<extra></extra>")))
-
-    fig.add_annotation(x=tx,y=ty+2.6,text=f"<b>{s.talent_name.upper()}</b>",
-                       showarrow=False,font=dict(size=12,color="#FF4466",family="Barlow Condensed"),align="center")
+    # ── MARKERS  — fixtures, camera bodies and talent center dot ─────
+    # One trace for all of them: per-point style arrays, and a per-point
+    # hovertemplate so each kind keeps its own hover text.
+    talent_hover = (f"<b>{s.talent_name}</b><br>"
+                    f"X: {tx:.1f} ft ({ft_m(tx):.1f} m)<br>"
+                    f"Y: {ty:.1f} ft ({ft_m(ty):.1f} m)<br>"
+                    f"Cam→Talent: {cam_to_t:.1f} ft ({ft_m(cam_to_t):.1f} m)<br>"
+                    f"Key→Talent: {key_to_t:.1f} ft ({ft_m(key_to_t):.1f} m)<extra></extra>")
+    n_l, n_c = len(lm_x), len(cb_x)
+    traces.append(dict(type="scatter",x=lm_x+cb_x+[tx],y=lm_y+cb_y+[ty],mode="markers",
+        marker=dict(size=[14]*n_l+cb_size+[30],
+                    color=lm_c+cb_color+["rgba(255,23,68,0.08)"],
+                    symbol=["square"]*(n_l+n_c)+["circle"],
+                    line=dict(color=["#02050C"]*n_l+cb_line+["#FF1744"],
+                              width=[2]*n_l+[2.5]*n_c+[3.0])),
+        showlegend=False,customdata=lm_data+cb_data+[()],
+        hovertemplate=[LIGHT_HOVER]*n_l+[CAM_HOVER]*n_c+[talent_hover]))
+
+    annots.append(dict(x=tx,y=ty+2.6,text=f"<b>{s.talent_name.upper()}</b>",
+                       showarrow=False,font=dict(size=12,color="#FF4466",family="Barlow Condensed"),align="center"))
 
     # ── RATIO BADGE (right margin) ───────────────────────────────────
     rr,rg,rb = hex_rgb(rc)
-    fig.add_annotation(x=W+0.8,y=H-1,xanchor="left",
+    annots.append(dict(x=W+0.8,y=H-1,xanchor="left",
         text=f"<b>KEY:FILL</b><br><span style='font-size:22px'><b>{rl}</b></span><br><i style='font-size:9px'>{rm}</i>",
         showarrow=False,bgcolor=rc,bordercolor=rc,
-        borderwidth=2,borderpad=10,font=dict(size=10,color="white",family="Barlow Condensed"),align="center")
+        borderwidth=2,borderpad=10,font=dict(size=10,color="white",family="Barlow Condensed"),align="center"))
 
     # ── LOWER-THIRD TELEMETRY BARS ───────────────────────────────────
-    al = f"KEY {s.key_kelvin}K"
-    if s.fill1_on: al += f"  ·  F1 {s.fill1_kelvin}K"
-    if s.back_on:  al += f"  ·  BACK {s.back_kelvin}K"
-    if s.fill2_on: al += f"  ·  F2 {s.fill2_kelvin}K"
-    nd_s   = s.nd_label.split("—")[0].strip()
+    lgt = [f"KEY {s.key_kelvin}K"]
+    if s.fill1_on: lgt.append(f"F1 {s.fill1_kelvin}K")
+    if s.back_on:  lgt.append(f"BACK {s.back_kelvin}K")
+    if s.fill2_on: lgt.append(f"F2 {s.fill2_kelvin}K")
+    al = "  ·  ".join(lgt)
+    nd_s   = ND_SHORT[s.nd_label]
     fps_s  = f"{s.fps}fps {s.resolution}" if s.mode=="Video/Cinema" else "PHOTO"
 
     rows = [
@@ -778,29 +926,53 @@ def draw_floor_plan():
         ry = -2.6-i*1.45
         br2,bg2,bb2 = hex_rgb(bg)
         tr,tg,tb    = hex_rgb(tc)
-        fig.add_shape(type="rect",x0=0,y0=ry-0.6,x1=W,y1=ry+0.6,
-                      fillcolor=f"rgba({br2},{bg2},{bb2},0.85)",
-                      line=dict(color=f"rgba({tr},{tg},{tb},0.6)",width=1))
+        shapes.append(dict(type="rect",x0=0,y0=ry-0.6,x1=W,y1=ry+0.6,
+                           fillcolor=f"rgba({br2},{bg2},{bb2},0.85)",
+                           line=dict(color=f"rgba({tr},{tg},{tb},0.6)",width=1)))
         # Left accent stripe
-        fig.add_shape(type="rect",x0=0,y0=ry-0.6,x1=0.4,y1=ry+0.6,
-                      fillcolor=f"rgba({tr},{tg},{tb},0.8)",
-                      line=dict(color="rgba(0,0,0,0)",width=0))
-        fig.add_annotation(x=0.7,y=ry,text=txt,showarrow=False,
+        shapes.append(dict(type="rect",x0=0,y0=ry-0.6,x1=0.4,y1=ry+0.6,
+                           fillcolor=f"rgba({tr},{tg},{tb},0.8)",
+                           line=dict(color="rgba(0,0,0,0)",width=0)))
+        annots.append(dict(x=0.7,y=ry,text=txt,showarrow=False,
                            font=dict(size=9,color=tc,family="JetBrains Mono"),
-                           xanchor="left",align="left")
+                           xanchor="left",align="left"))
 
     # ── LAYOUT ──────────────────────────────────────────────────────
-    fig.update_layout(
-        margin=dict(l=55,r=175,t=16,b=16),
-        paper_bgcolor="#02040A",
-        plot_bgcolor="#02040A",
-        xaxis=dict(range=[-3,W+11],showgrid=False,zeroline=False,
-                   showticklabels=False,scaleanchor="y",scaleratio=1,fixedrange=True),
-        yaxis=dict(range=[-12.5,H+4.5],showgrid=False,zeroline=False,
-                   showticklabels=False,fixedrange=True),
-        height=780, dragmode=False, showlegend=False,
+    return dict(data=traces, layout=dict(_build_plan_layout(W, H), shapes=shapes, annotations=annots))
+
+
+# Chart selection events rerun only this fragment. A click that actually
+# moves talent still needs the full app rerun — sidebar sliders, metric
+# strip and telemetry all read talent_x/y.
+@st.fragment
+def render_floor_plan():
+    # A fragment rerun skips main()'s init_state(), but widget keys of
+    # sliders hidden last run (e.g. Back/Fill 1 switched off) are gone by
+    # now and the plan still reads them — re-seed before drawing.
+    init_state()
+    s   = st.session_state
+    fig = draw_floor_plan()
+    chart_event = st.plotly_chart(
+        fig,
+        use_container_width=True,
+        on_select="rerun",
+        key="previz_stage",
+        theme=None,   # the plan sets every colour itself — skip Streamlit's re-theming
+        config=PLAN_CONFIG,
     )
-    return fig
+
+    # Handle click — move talent to clicked stage position
+    if chart_event and hasattr(chart_event,"selection") and chart_event.selection:
+        pts = getattr(chart_event.selection,"points",[])
+        for pt in pts:
+            x_click = pt.get("x", None)
+            y_click = pt.get("y", None)
+            if x_click is not None and y_click is not None:
+                # Only move talent if click is inside stage bounds
+                if 0.5 <= x_click <= STAGE_W-0.5 and 0.5 <= y_click <= STAGE_H-0.5:
+                    s.talent_x = round(float(x_click), 1)
+                    s.talent_y = round(float(y_click), 1)
+                    st.rerun(scope="app")
 
 
 # ─────────────────────────────────────────────
@@ -866,6 +1038,40 @@ def render_metric_strip(fstop, fov, rl, rc, shutter_str, c_to_t):
 # SIDEBAR
 # ─────────────────────────────────────────────
 
+# One expander per section holding all of its glossary terms, rather than
+# an expander + caption pair per term (~20 of each on every rerun).
+def sidebar_tips(title, keys):
+    with st.sidebar.expander(f"i  {title}"):
+        st.caption("\n\n".join(f"**{k}** — {TIPS[k]}" for k in keys))
+
+def light_controls(box, k_int, k_k, int_label, k_label, bold=False):
+    # Intensity + colour-temperature sliders and the Kelvin swatch, drawn into
+    # the sidebar or an expander (box)
+    box.slider(int_label,0,100,step=1,key=k_int)
+    box.slider(k_label,2000,10000,step=100,key=k_k)
+    k     = st.session_state[k_k]
+    lc,ln = kelvin_to_display(k)
+    txt   = f"<b>{k}K</b>  ·  {ln}" if bold else f"{k}K · {ln}"
+    box.markdown(f"<div class='kswatch' style='background:{lc}'>{txt}</div>",
+                 unsafe_allow_html=True)
+
+def set_state(**kw):
+    # Button callback — runs before the rerun the click already triggers
+    st.session_state.update(kw)
+
+def commit(name):
+    # Selectbox on_change — copy widget key w_<name> into the canonical key.
+    # The widget key is dropped whenever the widget isn't drawn (e.g. FPS in
+    # Photography mode); the canonical one the plan reads always survives.
+    s = st.session_state
+    s[name] = s["w_"+name]
+
+def light_toggle(label, k_on):
+    # Bold fixture label with its on/off switch alongside; returns the switch
+    c1,c2 = st.sidebar.columns([3,1])
+    with c1: st.markdown(f"**{label}**")
+    with c2: return st.toggle("",value=st.session_state[k_on],key=k_on)
+
 def render_sidebar():
     s = st.session_state
     shutter_str = SHUTTER_BY_FPS.get(s.fps,"1/48") if s.mode=="Video/Cinema" else "1/100"
@@ -876,17 +1082,15 @@ def render_sidebar():
 
     # ── MODE ──────────────────────────────────────
     st.sidebar.subheader("Mode")
-    opts    = ["Video/Cinema","Photography"]
-    nm      = st.sidebar.selectbox("Mode",opts,index=opts.index(s.mode),label_visibility="collapsed")
-    if nm != s.mode: st.session_state.mode=nm; st.rerun()
-    with st.sidebar.expander("i  What is Mode?"): st.caption(TIPS["Mode"])
+    st.sidebar.selectbox("Mode",MODE_OPTIONS,index=MODE_INDEX[s.mode],label_visibility="collapsed",
+                         key="w_mode",on_change=commit,args=("mode",))
+    sidebar_tips("What is Mode?", ("Mode",))
     st.sidebar.divider()
 
     # ── CAMERA ────────────────────────────────────
     st.sidebar.subheader("Camera")
-    nl = st.sidebar.selectbox("Lens",LENS_OPTIONS,index=LENS_OPTIONS.index(s.lens))
-    if nl != s.lens: st.session_state.lens=nl; st.rerun()
-    with st.sidebar.expander("i  What is FOV?"): st.caption(TIPS["FOV"])
+    st.sidebar.selectbox("Lens",LENS_OPTIONS,index=LENS_INDEX[s.lens],
+                         key="w_lens",on_change=commit,args=("lens",))
 
     st.sidebar.checkbox("Enable Moving Shot",key="moving_shot_on")
     if s.moving_shot_on:
@@ -895,55 +1099,46 @@ def render_sidebar():
         st.sidebar.slider("Start Pan — Pos A (deg)", -45,45, step=1,  key="start_pan")
         st.sidebar.slider("End Dolly — Pos B (ft)",  0.5,9.0,step=0.5,key="end_dolly")
         st.sidebar.slider("End Pan — Pos B (deg)",   -45,45, step=1,  key="end_pan")
-        po  = ["Line","Soft Curve"]
-        npt = st.sidebar.selectbox("Path Type",po,index=po.index(s.path_type))
-        if npt != s.path_type: st.session_state.path_type=npt; st.rerun()
+        st.sidebar.selectbox("Path Type",PATH_OPTIONS,index=PATH_INDEX[s.path_type],
+                             key="w_path_type",on_change=commit,args=("path_type",))
         st.sidebar.slider("Progress",0.0,1.0,step=0.01,key="progress",
                           format="%d%%",help="Scrub through the move")
         cp,cs = st.sidebar.columns(2)
         with cp:
-            if st.button("PLAY",disabled=s.auto_play,use_container_width=True):
-                s.auto_play=True; st.rerun()
+            st.button("PLAY",disabled=s.auto_play,use_container_width=True,
+                      on_click=set_state,kwargs=dict(auto_play=True))
         with cs:
-            if st.button("STOP",disabled=not s.auto_play,use_container_width=True):
-                s.auto_play=False; st.rerun()
+            st.button("STOP",disabled=not s.auto_play,use_container_width=True,
+                      on_click=set_state,kwargs=dict(auto_play=False))
         if s.auto_play:
             s.progress = min(1.0,s.progress+0.05)
             if s.progress >= 1.0: s.auto_play=False
             time.sleep(0.08); st.rerun()
-        with st.sidebar.expander("i  Moving Shot"):  st.caption(TIPS["Moving Shot"])
-        with st.sidebar.expander("i  Chiaroscuro"):  st.caption(TIPS["Chiaroscuro"])
+        move_tips = ("Moving Shot","Chiaroscuro")
     else:
         st.sidebar.slider("Pan (deg)",  -45,45, step=1,  key="cam_pan")
         st.sidebar.slider("Dolly (ft)",  0.5,9.0,step=0.5,key="cam_dolly")
-        with st.sidebar.expander("i  What is Pan?"):   st.caption(TIPS["Pan"])
-        with st.sidebar.expander("i  What is Dolly?"): st.caption(TIPS["Dolly"])
-    with st.sidebar.expander("i  Master Shot"):  st.caption(TIPS["Master Shot"])
-    with st.sidebar.expander("i  Fourth Wall"):  st.caption(TIPS["Fourth Wall"])
-    with st.sidebar.expander("i  Click Stage"):  st.caption(TIPS["Click Stage"])
+        move_tips = ("Pan","Dolly")
+    sidebar_tips("Camera terms", ("FOV",)+move_tips+("Master Shot","Fourth Wall","Click Stage"))
     st.sidebar.divider()
 
     # ── SPECS ─────────────────────────────────────
     st.sidebar.subheader("Specs")
     if s.mode=="Video/Cinema":
-        nf = st.sidebar.selectbox("FPS",FPS_OPTIONS,index=FPS_OPTIONS.index(s.fps))
-        if nf != s.fps: st.session_state.fps=nf; st.rerun()
+        st.sidebar.selectbox("FPS",FPS_OPTIONS,index=FPS_INDEX[s.fps],
+                             key="w_fps",on_change=commit,args=("fps",))
         shutter_str = SHUTTER_BY_FPS[s.fps]
         st.sidebar.markdown(
             f"<div class='shutter-info'>SHUTTER {shutter_str}s  ·  180-DEG RULE</div>",
             unsafe_allow_html=True)
-        nr = st.sidebar.selectbox("Resolution",RESOLUTION_OPTIONS,index=RESOLUTION_OPTIONS.index(s.resolution))
-        if nr != s.resolution: st.session_state.resolution=nr; st.rerun()
-        with st.sidebar.expander("i  Shutter Speed"): st.caption(TIPS["Shutter Speed"])
+        st.sidebar.selectbox("Resolution",RESOLUTION_OPTIONS,index=RES_INDEX[s.resolution],
+                             key="w_resolution",on_change=commit,args=("resolution",))
 
-    ni = st.sidebar.selectbox("ISO / Gain",ISO_OPTIONS,index=ISO_OPTIONS.index(s.iso))
-    if ni != s.iso: st.session_state.iso=ni; st.rerun()
-    with st.sidebar.expander("i  ISO"): st.caption(TIPS["ISO"])
+    st.sidebar.selectbox("ISO / Gain",ISO_OPTIONS,index=ISO_INDEX[s.iso],
+                         key="w_iso",on_change=commit,args=("iso",))
 
-    ndl   = list(ND_OPTIONS.keys())
-    nn    = st.sidebar.selectbox("ND Filter",ndl,index=ndl.index(s.nd_label))
-    if nn != s.nd_label: st.session_state.nd_label=nn; st.rerun()
-    with st.sidebar.expander("i  ND Filter"): st.caption(TIPS["ND Filter"])
+    st.sidebar.selectbox("ND Filter",ND_LABELS,index=ND_INDEX[s.nd_label],
+                         key="w_nd_label",on_change=commit,args=("nd_label",))
 
     nd_stops = ND_OPTIONS[s.nd_label]
     fstop    = calculate_fstop(s.key_intensity,s.iso,shutter_str,nd_stops,s.mode)
@@ -951,19 +1146,15 @@ def render_sidebar():
         f"<div class='fstop-card'><div class='fstop-label'>Suggested Aperture</div>"
         f"<div class='fstop-val'>{fstop}</div></div>",
         unsafe_allow_html=True)
-    with st.sidebar.expander("i  f-stop"): st.caption(TIPS["f-stop"])
+    sidebar_tips("Exposure terms",
+                 (("Shutter Speed",) if s.mode=="Video/Cinema" else ())+("ISO","ND Filter","f-stop"))
     st.sidebar.divider()
 
     # ── KEY LIGHT ─────────────────────────────────
     st.sidebar.subheader("Key Light")
-    st.sidebar.slider("Intensity (%)",     0,100,  step=1,  key="key_intensity")
-    st.sidebar.slider("Color Temp (K)", 2000,10000,step=100,key="key_kelvin")
-    kc,kn = kelvin_to_display(s.key_kelvin)
-    st.sidebar.markdown(f"<div class='kswatch' style='background:{kc}'><b>{s.key_kelvin}K</b>  ·  {kn}</div>",
-                        unsafe_allow_html=True)
+    light_controls(st.sidebar,"key_intensity","key_kelvin","Intensity (%)","Color Temp (K)",bold=True)
     st.sidebar.slider("Position Left/Right (ft)",2.0,28.0,step=0.5,key="key_x")
-    with st.sidebar.expander("i  Key Light"): st.caption(TIPS["Key Light"])
-    with st.sidebar.expander("i  Kelvin"):    st.caption(TIPS["Kelvin"])
+    sidebar_tips("Key Light terms", ("Key Light","Kelvin"))
     st.sidebar.divider()
 
     # ── OVERHEAD LIGHTS ───────────────────────────
@@ -972,31 +1163,16 @@ def render_sidebar():
         ("Fill 1  (upper left)","fill1_on","fill1_intensity","fill1_kelvin"),
         ("Back Light (Wall 2)", "back_on", "back_intensity", "back_kelvin"),
     ]:
-        c1,c2 = st.sidebar.columns([3,1])
-        with c1: st.markdown(f"**{lbl}**")
-        with c2: st.toggle("",value=getattr(s,k_on),key=k_on)
-        if getattr(s,k_on):
-            st.sidebar.slider(f"Intensity ({lbl[:4]})",0,100,step=1,key=k_int)
-            st.sidebar.slider(f"Kelvin ({lbl[:4]})",2000,10000,step=100,key=k_k)
-            lc,ln = kelvin_to_display(getattr(s,k_k))
-            st.sidebar.markdown(f"<div class='kswatch' style='background:{lc}'>{getattr(s,k_k)}K · {ln}</div>",
-                                unsafe_allow_html=True)
+        if light_toggle(lbl,k_on):
+            light_controls(st.sidebar,k_int,k_k,f"Intensity ({lbl[:4]})",f"Kelvin ({lbl[:4]})")
 
-    c1,c2 = st.sidebar.columns([3,1])
-    with c1: st.markdown("**Fill 2  (mobile)**")
-    with c2: st.toggle("",value=s.fill2_on,key="fill2_on")
-    if s.fill2_on:
-        with st.sidebar.expander("Fill 2 Settings"):
-            st.slider("Intensity (%)",0,100,step=1,key="fill2_intensity")
-            st.slider("Color Temp (K)",2000,10000,step=100,key="fill2_kelvin")
-            lc,ln = kelvin_to_display(s.fill2_kelvin)
-            st.markdown(f"<div class='kswatch' style='background:{lc}'>{s.fill2_kelvin}K · {ln}</div>",
-                        unsafe_allow_html=True)
-            st.slider("Pos X (ft)",2.0,28.0,step=0.5,key="fill2_x")
-            st.slider("Pos Y (ft)",2.0,18.0,step=0.5,key="fill2_y")
+    if light_toggle("Fill 2  (mobile)","fill2_on"):
+        f2 = st.sidebar.expander("Fill 2 Settings")
+        light_controls(f2,"fill2_intensity","fill2_kelvin","Intensity (%)","Color Temp (K)")
+        f2.slider("Pos X (ft)",2.0,28.0,step=0.5,key="fill2_x")
+        f2.slider("Pos Y (ft)",2.0,18.0,step=0.5,key="fill2_y")
 
-    with st.sidebar.expander("i  Fill Light"): st.caption(TIPS["Fill Light"])
-    with st.sidebar.expander("i  Back Light"): st.caption(TIPS["Back Light"])
+    sidebar_tips("Fill & Back terms", ("Fill Light","Back Light"))
     st.sidebar.divider()
 
     # ── LIGHT RATIO ───────────────────────────────
@@ -1009,12 +1185,13 @@ def render_sidebar():
         f"<div class='ratio-sb' style='background:{rc2}'>"
         f"KEY : FILL  {rl}<br><span class='ratio-sub'>{rm}</span></div>",
         unsafe_allow_html=True)
-    with st.sidebar.expander("i  Light Ratio"): st.caption(TIPS["Light Ratio"])
+    sidebar_tips("Light Ratio", ("Light Ratio",))
     st.sidebar.divider()
 
     # ── TALENT ────────────────────────────────────
     st.sidebar.subheader("Talent")
-    st.sidebar.text_input("Name",key="talent_name")
+    # Capped: the name is drawn into the plan twice and is part of its cache key
+    st.sidebar.text_input("Name",key="talent_name",max_chars=TALENT_NAME_MAX)
     txv = st.sidebar.slider("Left / Right (ft)",2.0,28.0,value=float(s.talent_x),step=0.5)
     s.talent_x = txv
     tyv = st.sidebar.slider("Depth from Wall 4 (ft)",2.0,18.0,value=float(s.talent_y),step=0.5)
@@ -1025,8 +1202,8 @@ def render_sidebar():
         f"<div class='dist-readout'>Cam to Talent: <b>{c2t:.1f} ft / {ft_m(c2t):.1f} m</b><br>"
         f"Key to Talent: <b>{k2t:.1f} ft / {ft_m(k2t):.1f} m</b></div>",
         unsafe_allow_html=True)
-    if st.sidebar.button("Reset to Center",use_container_width=True):
-        s.talent_x, s.talent_y = 15.0, 10.0; st.rerun()
+    st.sidebar.button("Reset to Center",use_container_width=True,
+                      on_click=set_state,kwargs=dict(talent_x=15.0,talent_y=10.0))
     st.sidebar.divider()
 
     # ── APPROVAL GATE ─────────────────────────────
@@ -1043,7 +1220,7 @@ def render_sidebar():
         st.sidebar.markdown(
             f"<div class='appr ok'>ALL APPROVED  ·  {s.approved_at}</div>",
             unsafe_allow_html=True)
-        st.sidebar.button("Print Floor Plan",use_container_width=True)
+        with st.sidebar: components.html(PRINT_BUTTON, height=40)
         st.sidebar.caption("Cmd/Ctrl+P → Landscape")
     else:
         st.sidebar.button("Print Floor Plan",disabled=True,use_container_width=True)
@@ -1052,7 +1229,7 @@ def render_sidebar():
         st.sidebar.markdown(
             f"<div class='appr pending'>WAITING: {' · '.join(rem)}</div>",
             unsafe_allow_html=True)
-    with st.sidebar.expander("i  Approval Gate"): st.caption(TIPS["Approval Gate"])
+    sidebar_tips("Approval Gate", ("Approval Gate",))
 
 
 # ─────────────────────────────────────────────
@@ -1064,7 +1241,7 @@ def main():
         page_title=f"PreViz {PREVIZ_VERSION} — Open Educational Edition",
         page_icon="🎬", layout="wide", initial_sidebar_state="expanded")
 
-    st.markdown(CSS, unsafe_allow_html=True)
+    st.html(CSS)
     init_state()
     render_sidebar()
 
@@ -1108,35 +1285,10 @@ def main():
     render_metric_strip(fstop, fov, rl, rc, shutter_str, c_to_t)
 
     # ── FLOOR PLAN + CLICK-TO-PLACE ─────────────
-    fig = draw_floor_plan()
-    chart_event = st.plotly_chart(
-        fig,
-        use_container_width=True,
-        on_select="rerun",
-        key="previz_stage",
-    )
-
-    # Handle click — move talent to clicked stage position
-    if chart_event and hasattr(chart_event,"selection") and chart_event.selection:
-        pts = getattr(chart_event.selection,"points",[])
-        for pt in pts:
-            x_click = pt.get("x", None)
-            y_click = pt.get("y", None)
-            if x_click is not None and y_click is not None:
-                # Only move talent if click is inside stage bounds
-                if 0.5 <= x_click <= STAGE_W-0.5 and 0.5 <= y_click <= STAGE_H-0.5:
-                    st.session_state.talent_x = round(float(x_click), 1)
-                    st.session_state.talent_y = round(float(y_click), 1)
-                    st.rerun()
+    render_floor_plan()
 
     # ── FOOTER ──────────────────────────────────
-    st.markdown(
-        "<div class='previz-footer'>"
-        "Developed by Eduardo Carmona, MFA — CSUDH · LMU  ·  "
-        "GNU GPL v3.0  ·  "
-        "Free for every student — from Los Angeles to Lima to Windhoek."
-        "</div>",
-        unsafe_allow_html=True)
+    st.html(FOOTER_HTML)
 
 
 if __name__ == "__main__":